@@ -1,11 +1,6 @@
-import sys
 import os
-import math
-import csv
-from typing import IO, Generator, List, Dict, Any, Union, Iterable
 
 import pandas as pd
-import numpy as np
 import click
 
 
@@ -50,35 +45,16 @@ def main(input_file, output_file, lang_column, alias_column, io_format):
     data = read(input_file, io_format).rename(columns={"name": "eng"})
     uniq_langs = data[lang_column].unique()
 
-    def deduplicate(subset_df):
-        out = {}
-
-        for ix, row in subset_df.reset_index().iterrows():
-            lang = row["language"]
-            out[lang] = row[lang]
-            out["id"] = row["id"]
-            out["type"] = row["type"]
-            out["eng"] = row["eng"]
-            out["url"] = row["url"]
-
-        return out
-
-    def alias_to_lang_col(row):
-        row[row[lang_column]] = row[alias_column]
-
-        return row
-
-    def generate_url(_id):
-        return f"https://www.wikidata.org/wiki/{_id}"
-
-    aggregated = data.apply(alias_to_lang_col, axis=1)
-    aggregated["url"] = aggregated.id.apply(generate_url)
-    column_ordering = (
-        ["id", "type", "eng"] + [lang for lang in uniq_langs] + ["url"]
+    # one row per (id, type) with an alias column per language,
+    # built column-wise instead of row by row
+    aggregated = (
+        data.groupby(["id", "type", lang_column])[alias_column]
+        .last()
+        .unstack(lang_column)
+        .join(data.groupby(["id", "type"]).eng.last())
+        .reset_index()
     )
-    aggregated = aggregated[column_ordering + ["language"]]
-    rows = aggregated.groupby(["id", "type"]).apply(deduplicate).tolist()
-    aggregated = pd.DataFrame(rows)[column_ordering]
+    aggregated["url"] = "https://www.wikidata.org/wiki/" + aggregated.id
 
     aggregated["ti_is_eng"] = aggregated.ti == aggregated.eng
     aggregated["am_is_eng"] = aggregated.am == aggregated.eng
@@ -2,33 +2,32 @@ import sys
 import os
 import math
 import csv
-from typing import IO, Generator, List, Dict, Any, Union, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, List, Dict, Any, Iterable
 
 from pymongo import MongoClient
-import wikidata_helpers as wh
+import orjson
 import click
 
 
 def output_jsonl(
-    documents: List[Dict[str, str]],
+    documents: Iterable[Dict[str, Any]],
     f: IO,
     languages: Iterable[str],
     conll_type: str,
     strict: bool = False,
     row_number: int = 0,
+    delimiter: str = ",",
 ) -> None:
+    f.writelines(
+        orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE).decode()
 
-    language_set = set(languages)
-
-    for doc in documents:
-        if strict and doc["language"] not in language_set:
-            continue
-        doc_str = wh.orjson_dump(doc)
-        f.write(f"{doc_str}\n")
+        for doc in documents
+    )
 
 
 def output_csv(
-    documents: List[Dict[str, str]],
+    documents: Iterable[Dict[str, Any]],
     f: IO,
     languages: Iterable[str],
     conll_type: str,
@@ -36,16 +35,16 @@ def output_csv(
     row_number: int = 0,
     delimiter: str = ",",
 ) -> None:
-    writer = csv.DictWriter(f, fieldnames=["language", "conll_type", "num_docs"])
-    language_set = set(languages)
+    writer = csv.writer(f, delimiter=delimiter)
 
     if row_number == 0:
-        writer.writeheader()
+        writer.writerow(("language", "conll_type", "num_docs"))
 
-    if strict:
-        documents = (doc for doc in docs if doc["language"] in language_set)
+    writer.writerows(
+        (doc["language"], doc["conll_type"], doc["num_docs"])
 
-    writer.writerows(documents)
+        for doc in documents
+    )
 
 
 def resolve_output_file(output_file: str, mode="a") -> IO:
@@ -70,30 +69,42 @@ def get_subclasses_per_type(subclasses, conll_type) -> List[str]:
 
 
 # TODO: type annotate
-def count_entities_per_type(db, conll_type, filter_dict):
+def count_entities_per_type(
+    db,
+    conll_type,
+    filter_dict,
+    languages: Iterable[str] = (),
+    strict: bool = False,
+) -> Iterable[Dict[str, Any]]:
 
-    results = db.aggregate(
+    match_dict = dict(filter_dict)
+    language_match: List[Dict[str, Any]] = []
+
+    # in strict mode, only keep documents and counts in the given languages
+    if strict:
+        language_filter = {"$in": list(languages)}
+        match_dict["languages"] = language_filter
+        language_match = [{"$match": {"languages": language_filter}}]
+
+    return db.aggregate(
         [
-            {"$match": filter_dict},
+            {"$match": match_dict},
+            # only the language list is needed past this point
+            {"$project": {"languages": 1, "_id": 0}},
             {"$unwind": "$languages"},
-            {"$project": {"_id": 1, "language": "$languages"}},
-            {"$group": {"_id": "$language", "nDocs": {"$sum": 1}}},
+            *language_match,
+            {"$group": {"_id": "$languages", "num_docs": {"$sum": 1}}},
             {
                 "$project": {
                     "language": "$_id",
-                    "num_docs": "$nDocs",
+                    "num_docs": 1,
+                    "conll_type": {"$literal": conll_type},
                     "_id": 0,
                 }
             },
         ]
     )
 
-    output = [{**res, "conll_type": conll_type} for res in results]
-
-    print(output[0])
-
-    return output
-
 
 @click.command()
 @click.option("--mongodb-uri", default="", help="MongoDB URI")
@@ -177,28 +188,45 @@ def main(
     subclasses = client[database_name][subclass_coll_name]
     db = client[database_name][collection_name]
 
-    results = []
-
-    for conll_type in conll_type_to_wikidata_id:
+    def count_one_type(conll_type: str) -> List[Dict[str, Any]]:
 
         # formulate a list of all valid instance-of classes
         valid_instance_ofs = get_subclasses_per_type(subclasses, conll_type)
 
         # fetch results from mongodb
         filter_dict = {"instance_of": {"$in": valid_instance_ofs}}
-        result = count_entities_per_type(db, conll_type, filter_dict)
-        results.extend(result)
-
-    with resolve_output_file(output_file) as fout:
-        output(
-            results,
-            f=fout,
-            languages=language_list,
-            conll_type=conll_type,
-            strict=strict,
-            row_number=0,
+
+        return list(
+            count_entities_per_type(
+                db,
+                conll_type,
+                filter_dict,
+                languages=language_list,
+                strict=strict,
+            )
         )
 
+    # the aggregations are independent and bound by the mongo server,
+    # so run them concurrently over the (thread-safe) shared client
+    conll_types = list(conll_type_to_wikidata_id)
+
+    with ThreadPoolExecutor(max_workers=len(conll_types)) as executor:
+        results_per_type = executor.map(count_one_type, conll_types)
+
+        with resolve_output_file(output_file) as fout:
+            for ix, (conll_type, results) in enumerate(
+                zip(conll_types, results_per_type)
+            ):
+                output(
+                    results,
+                    f=fout,
+                    languages=language_list,
+                    conll_type=conll_type,
+                    strict=strict,
+                    row_number=ix,
+                    delimiter=delimiter,
+                )
+
 
 if __name__ == "__main__":
     main()
@@ -1,36 +1,102 @@
-import sys
-import os
-import math
 import csv
-from typing import IO, Generator, List, Dict, Any, Union, Iterable
+from typing import List, Dict, Optional, Set, Tuple
 
 import wikidata_helpers as wh
 import pandas as pd
 import numpy as np
 import click
 
+# (id, type, eng) -> {language: alias}
+WideMatrix = Dict[Tuple[str, str, str], Dict[str, str]]
 
-def tall_to_wide(df):
-    return df.pivot(
-        index=["id", "type", "eng"], values="alias", columns="language"
-    ).fillna("")
+
+def as_text(column: pd.Series) -> np.ndarray:
+    """Returns the values of column as str, with missing values empty"""
+
+    return column.astype(object).fillna("").astype(str).to_numpy()
+
+
+def tall_to_wide(
+    df: pd.DataFrame, matrix: Optional[WideMatrix] = None
+) -> WideMatrix:
+    """Collects the aliases of each (id, type, eng) triple into a sparse
+    {language: alias} dict, avoiding the dense NaN-filled frame of df.pivot
+
+    If `matrix` is given, it is updated in place, so that the wide matrix
+    can be built up one chunk of the input at a time.
+    """
+
+    if matrix is None:
+        matrix = {}
+
+    rows = zip(
+        as_text(df["id"]),
+        as_text(df["type"]),
+        as_text(df["eng"]),
+        df["language"].to_numpy(),
+        as_text(df["alias"]),
+    )
+
+    for _id, _type, eng, language, alias in rows:
+        key = (_id, _type, eng)
+        row = matrix.get(key)
+
+        if row is None:
+            matrix[key] = {language: alias}
+        else:
+            row[language] = alias
+
+    return matrix
+
+
+def wide_to_frame(matrix: WideMatrix, languages: List[str]) -> pd.DataFrame:
+    """Materializes the output of tall_to_wide as a dense data frame"""
+
+    return (
+        pd.DataFrame.from_dict(matrix, orient="index", columns=languages)
+        .rename_axis(["id", "type", "eng"])
+        .sort_index()
+        .fillna("")
+    )
 
 
 def clean(data):
 
     # rename column "name" to "eng"
-    data = data.rename(columns={"name": "eng"}).copy()
+    data = data.rename(columns={"name": "eng"})
 
-    # remove all names that aren't entities
-    data = data[data.id.str.startswith("Q")]
+    # remove all names that aren't entities, truncating to the first
+    # character as a fixed-width numpy array instead of using .str.
+    # a missing id truncates to "n" and is dropped like any non-entity
+    is_entity = data["id"].to_numpy().astype("U1") == "Q"
 
     # remove all tigrinya and amharic that equals english
-    ti_or_am = (data.language == "ti") | (data.language == "am")
-    alias_equals_eng = data.alias == data.eng
-    mask = (ti_or_am) & (alias_equals_eng)
-    data = data[~mask]
+    ti_or_am = data["language"].isin(["ti", "am"]).to_numpy()
+    alias_equals_eng = data["alias"].to_numpy() == data["eng"].to_numpy()
+
+    return data[is_entity & ~(ti_or_am & alias_equals_eng)]
+
+
+def output_matrix(
+    matrix: WideMatrix,
+    languages: List[str],
+    output_file: str,
+    delimiter: str = "\t",
+) -> None:
+    """Writes the wide matrix as delimited text, one row at a time.
 
-    return data
+    Rows are streamed from the sparse matrix in sorted key order, so the
+    dense table is never materialized. Values are quoted only when needed.
+    """
+
+    with open(output_file, "w", encoding="utf-8", newline="") as fout:
+        writer = csv.writer(fout, delimiter=delimiter, lineterminator="\n")
+        writer.writerow(("id", "type", "eng", *languages))
+        writer.writerows(
+            (*key, *(matrix[key].get(lang, "") for lang in languages))
+
+            for key in sorted(matrix)
+        )
 
 
 @click.command()
@@ -42,14 +108,41 @@ def clean(data):
     type=click.Choice(["csv", "tsv", "jsonl"]),
     default="tsv",
 )
-def main(input_file, output_file, io_format):
+@click.option(
+    "--chunk-size",
+    "-c",
+    type=int,
+    default=1000000,
+    help="Number of input rows to process at a time (csv/tsv only)",
+)
+def main(input_file, output_file, io_format, chunk_size):
 
-    data = wh.read(input_file, io_format)
-    data = clean(data)
-    matrix = tall_to_wide(data)
-    wh.write(
-        matrix, output_file, io_format, index=(io_format in ["csv", "tsv"])
-    )
+    matrix: WideMatrix = {}
+    unique_languages: Set[str] = set()
+
+    # only one chunk of the tall input is held in memory at a time
+    for data in wh.read_chunks(input_file, io_format, chunk_size):
+
+        # repeated strings are stored once, rows hold integer codes
+        for column in ["language", "type"]:
+            if column in data.columns:
+                data[column] = data[column].astype("category")
+
+        data = clean(data)
+        tall_to_wide(data, matrix)
+        unique_languages.update(data["language"].unique())
+
+    languages = sorted(unique_languages)
+
+    if io_format in ["csv", "tsv"]:
+        output_matrix(
+            matrix,
+            languages,
+            output_file,
+            delimiter="\t" if io_format == "tsv" else ",",
+        )
+    else:
+        wh.write(wide_to_frame(matrix, languages), output_file, io_format)
 
 
 if __name__ == "__main__":
@@ -9,26 +9,24 @@ import wikidata_helpers as wh
 
 def deduplicate(data: pd.DataFrame) -> pd.DataFrame:
 
-    # count how many types for each id
-    id_to_ntypes_df = (
+    original_row_count = data.shape[0]
+
+    # distinct (id, type) pairs, sorted so type strings come out canonical.
+    # types are compared as strings, since a categorical sorts by its codes
+    id_type_pairs = (
         data[["id", "type"]]
         .drop_duplicates()
-        .groupby("id")
-        .type.size()
-        .reset_index()
-        .rename(columns={"type": "n_types"})
+        .sort_values(["id", "type"], key=lambda column: column.astype(str))
     )
 
-    # join this to the original data frame
-    data_old = data.copy()  # copy this just in case
-    data = data.merge(id_to_ntypes_df, on="id")
+    # ids with more than one type are the ambiguous ones
+    is_ambiguous = id_type_pairs.id.duplicated(keep=False)
 
     # if id is in this dict, it will have several types
     id_to_type_string = (
-        data[data.n_types > 1][["id", "type"]]
-        .drop_duplicates()
-        .groupby("id")
-        .apply(lambda df: "-".join(sorted(df.type.unique())))
+        id_type_pairs[is_ambiguous]
+        .groupby("id", sort=False)
+        .type.agg("-".join)
         .to_dict()
     )
 
@@ -47,60 +45,50 @@ def deduplicate(data: pd.DataFrame) -> pd.DataFrame:
         for _id, type_str in id_to_type_string.items()
     }
 
-    # replace with canonical types, non-ambiguous ones get None
-    canonical_types = data.id.apply(
-        lambda _id: id_to_canonical_type.get(_id, None)
-    )
+    # replace with canonical types, non-ambiguous ones get NaN
+    canonical_types = data.id.map(id_to_canonical_type)
 
     # put the old non-ambiguous types back in
-    new_types = [
-        old_type if new_type is None else new_type
-
-        for old_type, new_type in zip(data.type, canonical_types)
-    ]
-
-    data["type"] = new_types
-
-    # finally drop the extra column we created
-    data = data.drop("n_types", 1)
+    data = data.assign(
+        type=canonical_types.where(canonical_types.notna(), data.type)
+    )
 
     # also drop duplicate rows
     data = data.drop_duplicates()
 
     # final check to make sure no id has more than 1 type
-    assert all(
-        data[["id", "type"]].drop_duplicates().groupby("id").type.size() == 1
-    )
+    assert not data[["id", "type"]].drop_duplicates().id.duplicated().any()
 
     # print out some information to the user
     print("Deduplication complete")
-    print(f"No. of rows, original: {data_old.shape[0]}")
+    print(f"No. of rows, original: {original_row_count}")
     print(f"No. of rows, deduplicated: {data.shape[0]}")
-    print(f"Rows removed = {data_old.shape[0] - data.shape[0]}")
+    print(f"Rows removed = {original_row_count - data.shape[0]}")
 
     return data
 
 
 def filter_am_ti(data: pd.DataFrame) -> pd.DataFrame:
+
+    # nothing to filter, so skip reading the id list altogether
+    is_am_ti = data.language.isin(["am", "ti"]).to_numpy()
+
+    if not is_am_ti.any():
+        print("No Amharic/Tigrinya rows found, skipping filtering")
+
+        return data
+
     with open("./data/am_ti_kept_ids.txt", encoding="utf8") as f:
-        am_ti_kept_ids = set([l.strip() for l in f])
+        am_ti_kept_ids = frozenset(l.strip() for l in f)
 
         print(
             f"Loaded {len(am_ti_kept_ids)} IDs to keep for Amharic/Tigrinya..."
         )
 
-    # construct a mask for items that are to be excluded
-
-    def should_keep(row):
-        if row.language not in ["am", "ti"]:
-            return True
-        else:
-            id_is_suitable = row.id in am_ti_kept_ids
-            alias_not_eng = row.alias != row.eng
-
-            return id_is_suitable and alias_not_eng
-
-    keep_these = data.apply(should_keep, axis=1)
+    # am/ti rows are kept only if the id is suitable and alias is not english
+    id_is_suitable = data.id.isin(am_ti_kept_ids).to_numpy()
+    alias_not_eng = data.alias.to_numpy() != data.eng.to_numpy()
+    keep_these = ~is_am_ti | (id_is_suitable & alias_not_eng)
 
     filtered = data[keep_these]
 
@@ -127,11 +115,18 @@ def main(input_file, output_file, alias_column, english_column):
     # read in data
     data = wh.read(input_file, io_format="tsv")
 
+    # categorical columns are deduplicated and grouped on integer codes
+    for column in ["language", "type"]:
+        if column in data.columns:
+            data[column] = data[column].astype("category")
+
     # change <english_column> to "english"
     data = data.rename(columns={english_column: "eng"})
 
-    # add is_latin column
-    data["is_latin"] = data[alias_column].apply(latin_checker)
+    # add is_latin column, checking each distinct alias only once
+    unique_aliases = pd.unique(data[alias_column].to_numpy())
+    alias_is_latin = {alias: latin_checker(alias) for alias in unique_aliases}
+    data["is_latin"] = data[alias_column].map(alias_is_latin)
 
     # deduplicate rows using trumping rules
     data = deduplicate(data)
@@ -2,11 +2,10 @@
 
 import multiprocessing as mp
 from functools import partial
-from typing import Generator, List, Iterable, Tuple, Dict
+from typing import List, Iterable, Tuple, Dict
 
 import click
-from qwikidata.sparql import get_subclasses_of_item
-from pymongo import MongoClient
+from pymongo import UpdateOne
 from wikidata_helpers import WikidataMongoDB, WikidataRecord, chunks
 from bson.objectid import ObjectId
 
@@ -46,8 +45,11 @@ def parallel_upsert(
         print(f"Updating documents {_from} - {_to}...")
 
     chunk = grab_metadata_from_chunk(chunk)
-    for _id, doc in chunk:
-        wdb.collection.update_one({"_id": ObjectId(_id)}, {"$set": doc}, upsert=True)
+    updates = [
+        UpdateOne({"_id": ObjectId(_id)}, {"$set": doc}, upsert=True)
+        for _id, doc in chunk
+    ]
+    wdb.collection.bulk_write(updates, ordered=False)
 
 
 @click.command()
@@ -77,7 +79,8 @@ def main(database_name, collection_name, chunk_size, n_processes, verbose,) -> N
     )
 
     with mp.Pool(processes=n_processes) as pool:
-        pool.map(_parallel_upsert, chunks_iterable)
+        for _ in pool.imap_unordered(_parallel_upsert, chunks_iterable):
+            pass
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
+import sys
+
+import orjson
 from pymongo import MongoClient
-from wikidata_helpers import orjson_dump
 
 def main():
     client = MongoClient()
@@ -7,7 +9,7 @@ def main():
 
     results = db.aggregate([
         # {"$limit": 1000},
-        {"$project": {"languages": 1, "_id": 1}},
+        {"$project": {"languages": 1, "_id": 0}},
         {"$unwind": "$languages"},
         {"$group": {
                "_id": "$languages",
@@ -21,10 +23,12 @@ def main():
                 "language": "$_id", "nEntities": 1, "_id": 0
             }
         }
-    ]);
+    ], allowDiskUse=True)
 
     for result in results:
-        print(orjson_dump(result))
+        sys.stdout.buffer.write(
+            orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE)
+        )
 
 if __name__ == "__main__":
     main()
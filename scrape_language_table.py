@@ -1,8 +1,6 @@
-from typing import List
-
 from wikidata_helpers import orjson_dump
 import requests
-import cssselect
+import cssselect  # noqa: F401 (required by lxml.html .cssselect())
 import lxml.html as html
 import click
 import pandas as pd
@@ -1,11 +1,6 @@
-import sys
 import os
-import math
-import csv
-from typing import IO, Generator, List, Dict, Any, Union, Iterable
 
 import wikidata_helpers as wh
-import pandas as pd
 import click
 
 
@@ -31,9 +26,8 @@ def main(lang_column, input_file, io_format):
 
     data = wh.read(input_file, io_format)
 
-    for lang in data[lang_column].unique():
-        filtered = data[data[lang_column] == lang]
-
+    # a single groupby pass instead of one boolean mask per language
+    for lang, filtered in data.groupby(lang_column, sort=False):
         output_file = get_output_filename(input_file, lang)
 
         wh.write(filtered, output_file, io_format)
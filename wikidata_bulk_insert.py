@@ -1,10 +1,6 @@
 #!/usr/bin/env python3
 
-import math
-from typing import Generator, Set, List
-
 import click
-from qwikidata.sparql import get_subclasses_of_item
 from pymongo import MongoClient
 from wikidata_helpers import WikidataDump, chunks
 
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 
 import math
-from typing import Generator, Set, List
 import multiprocessing as mp
 
 import click
@@ -2,10 +2,11 @@ import sys
 import os
 import math
 import csv
-from typing import IO, Generator, List, Dict, Any, Union, Iterable
+from typing import IO, Iterable
 
 from pymongo import MongoClient
 import wikidata_helpers as wh
+import orjson
 import click
 
 
@@ -23,19 +24,22 @@ def output_jsonl(
     name = document.name
     language_set = set(languages)
 
-    for lang, alias in document.aliases.items():
-        if strict and lang not in language_set:
-            continue
-        row = wh.orjson_dump(
+    # orjson appends the newline itself, so each row is a single string
+    f.writelines(
+        orjson.dumps(
             {
                 "id": wikidata_id,
                 "name": name,
                 "alias": alias,
                 "language": lang,
                 "type": conll_type,
-            }
-        )
-        f.write(f"{row}\n")
+            },
+            option=orjson.OPT_APPEND_NEWLINE,
+        ).decode("utf-8")
+
+        for lang, alias in document.aliases.items()
+        if not strict or lang in language_set
+    )
 
 
 def output_csv(
@@ -52,31 +56,18 @@ def output_csv(
     language_set = set(languages)
     wikidata_id = document.id
     name = document.name
-    writer = csv.DictWriter(
-        f,
-        delimiter=delimiter,
-        fieldnames=["id", "name", "alias", "language", "type"],
-    )
+    writer = csv.writer(f, delimiter=delimiter)
 
     if row_number == 0:
-        writer.writeheader()
-    rows = (
-        {
-            "id": wikidata_id,
-            "name": name,
-            "alias": alias,
-            "language": lang,
-            "type": conll_type,
-        }
+        writer.writerow(("id", "name", "alias", "language", "type"))
+
+    writer.writerows(
+        (wikidata_id, name, alias, lang, conll_type)
 
         for lang, alias in document.aliases.items()
+        if not strict or lang in language_set
     )
 
-    if strict:
-        rows = (row for row in rows if row["language"] in language_set)
-
-    writer.writerows(rows)
-
 
 def resolve_output_file(output_file: str, mode="a") -> IO:
 
@@ -5,12 +5,18 @@ import math
 import os
 import itertools
 
-from typing import Generator, Set, List, Union, Dict, Any, IO, Tuple
+from typing import Generator, Set, List, Union, Dict, Any, IO, Iterable, Tuple
 from pymongo import MongoClient
 
 import unicodedata as ud
 import pandas as pd
 
+# optional: parallel bz2 decompression for WikidataDump
+try:
+    import indexed_bzip2
+except ImportError:
+    indexed_bzip2 = None
+
 
 def read(input_file: str, io_format: str) -> pd.DataFrame:
     if io_format in ["csv", "tsv"]:
@@ -18,11 +24,34 @@ def read(input_file: str, io_format: str) -> pd.DataFrame:
             input_file,
             encoding="utf-8",
             delimiter="\t" if io_format == "tsv" else ",",
+            engine="pyarrow",
         )
     else:
         return pd.read_json(input_file, "records", encoding="utf-8")
 
 
+def read_chunks(
+    input_file: str, io_format: str, chunk_size: int
+) -> Iterable[pd.DataFrame]:
+    """Reads input_file as an iterable of data frames of chunk_size rows.
+
+    Only CSV/TSV can be read incrementally; other formats are read
+    in full and yielded as a single chunk. As with read, language codes
+    such as "nan" (Min Nan) are kept as strings rather than parsed as NaN.
+    """
+
+    if io_format in ["csv", "tsv"]:
+        return pd.read_csv(
+            input_file,
+            encoding="utf-8",
+            delimiter="\t" if io_format == "tsv" else ",",
+            chunksize=chunk_size,
+            na_filter=False,
+        )
+    else:
+        return iter([read(input_file, io_format)])
+
+
 def write(
     data: pd.DataFrame, output_file: str, io_format: str, index: bool = False
 ) -> None:
@@ -94,12 +123,15 @@ def english_dissimilarity(df: pd.DataFrame) -> Tuple[int, int]:
 def compute_english_dissimilarity_df(csv: pd.DataFrame) -> pd.DataFrame:
     """Transform data frame of aliases to a data frame of english_dissimilarity scores"""
 
-    english_dissimilarity_tuples = (
-        csv.groupby(["language"]).apply(english_dissimilarity).reset_index()
+    # same masks as english_dissimilarity, but counted for all
+    # languages at once instead of applying it to each group
+    is_good = (csv["alias"] != csv["name"]) | (csv["name"] == csv["id"])
+    out = (
+        is_good.groupby(csv["language"])
+        .agg(["sum", "size"])
+        .rename(columns={"sum": "n_good", "size": "n_tot"})
+        .reset_index()
     )
-    out = english_dissimilarity_tuples[["language"]]
-    out["n_good"] = english_dissimilarity_tuples[0].apply(lambda t: t[0])
-    out["n_tot"] = english_dissimilarity_tuples[0].apply(lambda t: t[1])
     out["english_dissimilarity"] = out.n_good / out.n_tot
     out["english_similarity"] = 1 - out.english_dissimilarity
 
@@ -138,31 +170,59 @@ def chunks(iterable, size, should_enumerate=False):
 
 
 class WikidataDump:
-    def __init__(self, dumpfile: str) -> None:
+    def __init__(self, dumpfile: str, block_size: int = 1 << 20) -> None:
         self.dumpfile = os.path.abspath(dumpfile)
+        self.block_size = block_size
         self.n_decode_errors = 0
 
-    def open_dump_file(self, dumpfile) -> IO[Any]:
+    def open_dump_file(self, dumpfile) -> IO[bytes]:
         _, dumpfile_ext = os.path.splitext(dumpfile)
 
         if dumpfile_ext == ".bz2":
-            return bz2.open(dumpfile, mode="rt")
+            if indexed_bzip2 is not None:
+                return indexed_bzip2.open(
+                    dumpfile, parallelization=os.cpu_count()
+                )
+
+            return bz2.open(dumpfile, mode="rb")
         elif dumpfile_ext == ".json":
-            return open(dumpfile, mode="r", encoding="utf-8")
+            return open(dumpfile, mode="rb")
         else:
             raise ValueError("Dump file must be .json or .bz2")
 
+    def parse_lines(
+        self, lines: List[bytes]
+    ) -> Generator[Dict[str, Any], None, None]:
+        for line in lines:
+            try:
+                yield orjson.loads(line.rstrip(b","))
+            except orjson.JSONDecodeError:
+                self.n_decode_errors += 1
+
+                continue
+
     def __iter__(self) -> Generator[Dict[str, Any], None, None]:
+        """Reads the dump in blocks of self.block_size bytes and parses
+        the complete lines of each block, carrying over the partial last
+        line to the next block. orjson parses the raw bytes directly."""
+
         with self.open_dump_file(self.dumpfile) as f:
-            f.read(2)  # skip first two bytes: "{\n"
+            f.read(2)  # skip first two bytes: "[\n"
+            partial_line = b""
 
-            for line in f:
-                try:
-                    yield orjson.loads(line.rstrip(",\n"))
-                except orjson.JSONDecodeError:
-                    self.n_decode_errors += 1
+            while True:
+                block = f.read(self.block_size)
 
-                    continue
+                if not block:
+                    break
+
+                lines = (partial_line + block).split(b"\n")
+                partial_line = lines.pop()
+
+                yield from self.parse_lines(lines)
+
+            if partial_line:
+                yield from self.parse_lines([partial_line])
 
 
 class WikidataRecord:
@@ -381,7 +441,8 @@ class WikidataMongoIngesterWorker:
         caches the ingested lines, and bulk inserts them
         to a specified MongoDB collection as required."""
 
-        with open(self.input_path, encoding="utf-8") as f:
+        # binary mode: orjson parses the raw bytes without a decode pass
+        with open(self.input_path, mode="rb") as f:
             for line_nr, line in enumerate(f, start=1):
 
                 # if we're too early, skip
@@ -400,7 +461,7 @@ class WikidataMongoIngesterWorker:
 
                 if line_nr == self.next_read_at:
                     try:
-                        doc = orjson.loads(line.rstrip(",\n"))
+                        doc = orjson.loads(line.rstrip(b",\n"))
                         record = WikidataRecord(doc)
                         self.cache.append(
                             record.to_dict(simple=self.simple_records)
@@ -7,7 +7,6 @@ Based on https://anon.to/okOU3G
 """
 
 import math
-from typing import Generator, Set
 
 import click
 from qwikidata.sparql import get_subclasses_of_item
@@ -5,7 +5,6 @@ Get Wikidata subclass ontology as JSON and insert them to MongoDB
 
 """
 
-from itertools import chain
 from typing import Dict, Any
 
 import click